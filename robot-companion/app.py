@@ -4,22 +4,37 @@ Serves the web dashboard and handles real-time communication
 with the robot via WebSockets.
 """
 
-from flask import Flask, render_template, jsonify, Response
+from flask import Flask, render_template, Response, request
 from flask_socketio import SocketIO, emit
+from prometheus_client import REGISTRY, CONTENT_TYPE_LATEST, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
 import time
+import queue
 import threading
 import subprocess
+import tempfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from urllib.parse import urlsplit
 import cv2
 import os
+import orjson
+import requests
 from dotenv import load_dotenv
-from modules.vision import VisionAI
+from modules.vision import VisionAI, PHASH_THRESHOLD, SENTENCE_END
 from modules.gps import GPSReader
+from modules import orjson_compat
+from modules.mjpeg_server import MJPEGServer, MJPEG_MIMETYPE
 
 load_dotenv()
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'alzar-robot-companion'
-socketio = SocketIO(app, cors_allowed_origins="*", async_mode='threading')
+# threading mode + simple-websocket gives real WebSocket transport (not long-polling).
+# eventlet/gevent aren't used: they don't support the venv's Python 3.14, and the
+# camera/TTS workers are blocking subprocess readers that belong on real threads.
+socketio = SocketIO(app, cors_allowed_origins="*", async_mode='threading', json=orjson_compat)
 
 # --- Camera ---
 
@@ -29,70 +44,248 @@ class Camera:
     Streams MJPEG via rpicam-vid subprocess — avoids libcamera Python
     binding version conflicts with the venv's Python 3.14.
     Resolution: 1920x1080 @ 30fps (good balance of quality and performance).
+    JPEG quality adapts: when viewers fall behind the encoder is stepped down,
+    and stepped back up once the backlog has stayed clear for a while.
+    With a V4L2 device (USB webcam, e.g. the BRIO) the camera's own MJPEG is
+    copied through ffmpeg untouched instead — quality is then fixed by the camera.
     """
-    WIDTH  = 1920
-    HEIGHT = 1080
-    FPS    = 30
-
-    def __init__(self):
+    # Override in .env on weak uplinks, e.g. CAM_W=640 CAM_H=480 CAM_FPS=15
+    WIDTH  = int(os.environ.get('CAM_W', 1920))
+    HEIGHT = int(os.environ.get('CAM_H', 1080))
+    FPS    = int(os.environ.get('CAM_FPS', 30))
+
+    QUALITY        = int(os.environ.get('JPEG_Q', 50))  # 50 = rpicam-vid's default
+    MIN_QUALITY    = 30
+    QUALITY_STEP   = 10
+    ADAPT_HOLD     = 15.0  # min s between changes — each restarts rpicam-vid and blanks the stream ~1 s
+    ADAPT_RECOVER  = 30.0  # s of clean delivery before stepping back up
+    LAG_HIGH       = 0.5   # EMA of frames skipped per frame delivered: step down above this...
+    LAG_LOW        = 0.05  # ...and step back up only below this
+    RESTART_TRIES  = 3     # spawns at a new quality before falling back to the old one
+    RESTART_SETTLE = 1.0   # s a respawned rpicam-vid gets to deliver a frame / stay up
+
+    def __init__(self, device: str = None):
+        self.device = device   # V4L2 node for a USB MJPEG webcam; None = CSI via rpicam-vid
         self.proc = None
-        self.frame = None
+        self.frame_seq = 0   # bumped once per captured frame
+        self._latest = (None, 0)     # (jpeg, seq) published as one reference for lock-free reads
+        self._waiting = 0            # threads blocked in wait_frame()
+        self.viewers = 0             # open /video_feed streams
+        self.dropped_frames = 0      # frames overwritten before any viewer took them
+        self.skipped_frames = 0      # per-client misses, summed across viewers
+        self._consumed_seq = 0
+        self.capture_fps = 0.0       # EMA of the actual frame rate
+        self._last_frame_t = 0.0
         self.lock = threading.Lock()
+        self.cond = threading.Condition(self.lock)  # notified on every new frame
         self.running = False
+        self.quality = self.QUALITY
+        self.max_quality = self.QUALITY   # top of the adaptive ladder
+        self._restart_lock = threading.Lock()
+        self._lag_ema = 0.0
+        self._last_adjust = 0.0
+        self._last_backlog = 0.0
+        self._restart_seq = 0        # frame_seq when the encoder was last restarted
         self._start()
 
-    def _start(self):
-        cmd = [
+    def _command(self):
+        if self.device:
+            # -c:v copy: the webcam's JPEGs are remuxed, never decoded or re-encoded
+            return [
+                'ffmpeg', '-hide_banner', '-loglevel', 'error',
+                '-f', 'v4l2',
+                '-input_format', 'mjpeg',
+                '-video_size', f'{self.WIDTH}x{self.HEIGHT}',
+                '-framerate', str(self.FPS),
+                '-i', self.device,
+                '-c:v', 'copy',
+                '-f', 'mjpeg', '-',
+            ]
+        return [
             'rpicam-vid',
             '--camera', '0',
             '--codec', 'mjpeg',
             '--width',  str(self.WIDTH),
             '--height', str(self.HEIGHT),
             '--framerate', str(self.FPS),
+            '--quality', str(self.quality),
             '--inline',      # embed JPEG headers in stream
             '--nopreview',
             '-t', '0',       # run indefinitely
             '-o', '-',       # output to stdout
         ]
+
+    def _start(self):
         try:
             self.proc = subprocess.Popen(
-                cmd,
+                self._command(),
                 stdout=subprocess.PIPE,
                 stderr=subprocess.DEVNULL,
                 bufsize=0,
             )
             self.running = True
-            threading.Thread(target=self._capture_loop, daemon=True).start()
-            print(f"✅ OwlSight 64MP (OV64A40) opened via rpicam-vid — {self.WIDTH}x{self.HEIGHT}@{self.FPS}fps")
+            threading.Thread(target=self._capture_loop, args=(self.proc,), daemon=True).start()
+            if self.device:
+                print(f"✅ {self.device} opened via ffmpeg (MJPEG passthrough) — {self.WIDTH}x{self.HEIGHT}@{self.FPS}fps")
+            else:
+                print(f"✅ OwlSight 64MP (OV64A40) opened via rpicam-vid — {self.WIDTH}x{self.HEIGHT}@{self.FPS}fps q{self.quality}")
         except Exception as e:
             print(f"⚠️  Camera not available: {e}")
 
-    def _capture_loop(self):
-        """Parse MJPEG stream: scan for SOI (FF D8) ... EOI (FF D9) markers."""
-        buf = b''
-        while self.running and self.proc and self.proc.poll() is None:
-            chunk = self.proc.stdout.read(65536)
+    def _capture_loop(self, proc):
+        """
+        Parse MJPEG stream: scan for SOI (FF D8) ... EOI (FF D9) markers.
+        rpicam-vid already hands us hardware-encoded JPEGs, so frames are
+        passed through as-is — no decode, no re-encode. The buffer is a
+        bytearray and the EOI search resumes where the last read left off,
+        so a 200 KB frame isn't re-copied and re-scanned on every 64 KB read.
+        When a read completes several frames (the reader fell behind), only
+        the newest is copied out — the older ones would be overwritten unseen.
+        """
+        buf = bytearray()
+        while self.running and proc.poll() is None:
+            chunk = proc.stdout.read(65536)
             if not chunk:
                 time.sleep(0.01)
                 continue
+            scan = max(len(buf) - 1, 0)  # EOI may straddle the chunk boundary
             buf += chunk
+            pos = 0          # parse cursor; everything before it is consumed
+            latest = None    # (start, end) of the newest complete frame
+            parsed = 0
             while True:
-                start = buf.find(b'\xff\xd8')
+                start = buf.find(b'\xff\xd8', pos)
                 if start == -1:
-                    buf = b''
+                    # keep a trailing FF in case the SOI straddles two reads
+                    pos = len(buf) - 1 if buf.endswith(b'\xff') else len(buf)
                     break
-                end = buf.find(b'\xff\xd9', start + 2)
+                end = buf.find(b'\xff\xd9', max(start + 2, scan))
                 if end == -1:
-                    buf = buf[start:]  # keep partial frame
+                    pos = start  # keep partial frame
                     break
-                jpeg = buf[start:end + 2]
-                buf = buf[end + 2:]
-                with self.lock:
-                    self.frame = jpeg
+                latest = (start, end + 2)
+                pos = end + 2
+                parsed += 1
+            jpeg = bytes(buf[latest[0]:latest[1]]) if latest else None
+            del buf[:pos]
+            if jpeg is None:
+                continue
+            now = time.monotonic()
+            if self._last_frame_t and now > self._last_frame_t:
+                self.capture_fps = 0.9 * self.capture_fps + 0.1 * parsed / (now - self._last_frame_t)
+            self._last_frame_t = now
+            # This thread is the only writer, so publishing needs no lock — the
+            # lock is only taken to wake viewers, and only if any are waiting.
+            if self.viewers and self._consumed_seq != self.frame_seq:
+                self.dropped_frames += 1
+            seq = self.frame_seq + 1
+            self._latest = (jpeg, seq)
+            self.frame_seq = seq
+            if self._waiting:
+                with self.cond:
+                    self.cond.notify_all()
+
+    # Readers never take the lock: frames are immutable bytes and _latest is
+    # swapped as a single reference, so a reader always sees a matching pair
+    # and the capture thread never waits behind a consumer.
 
     def get_jpeg(self):
-        with self.lock:
-            return self.frame
+        return self._latest[0]
+
+    def wait_frame(self, last_seq, timeout=1.0):
+        """
+        Block until a frame newer than last_seq is captured (or timeout).
+        Returns (jpeg, seq); jpeg is None on timeout so callers can re-check the connection.
+        """
+        with self.cond:
+            # Registered before the predicate check: a frame published after this
+            # point is guaranteed to see _waiting > 0 and notify.
+            self._waiting += 1
+            try:
+                if not self.cond.wait_for(lambda: self.frame_seq != last_seq, timeout=timeout):
+                    return None, last_seq
+            finally:
+                self._waiting -= 1
+            jpeg, seq = self._latest
+            self._consumed_seq = seq
+            return jpeg, seq
+
+    def set_quality(self, quality):
+        """Restart the encoder at a new JPEG quality (clamped to MIN_QUALITY..100)."""
+        if self.device:
+            return  # passthrough: the webcam's encoder isn't ours to tune
+        quality = max(self.MIN_QUALITY, min(100, int(quality)))
+        with self._restart_lock:
+            if quality == self.quality:
+                return
+            previous, self.quality = self.quality, quality
+            self._restart_seq = self.frame_seq
+            old = self.proc
+            if old and old.poll() is None:
+                old.terminate()
+                try:
+                    old.wait(timeout=2)  # rpicam-vid must release the sensor first
+                except subprocess.TimeoutExpired:
+                    old.kill()
+            print(f"Camera: JPEG quality → {quality}")
+            if not self._respawn():
+                print(f"⚠️  Camera: rpicam-vid won't run at q{quality} — back to q{previous}")
+                self.quality = previous
+                if not self._respawn():
+                    print("⚠️  Camera: rpicam-vid failed to restart")
+            # Timed from when the new encoder is up, and a restart counts as
+            # recent backlog, so the next step up waits a full ADAPT_RECOVER
+            self._lag_ema = 0.0
+            self._last_adjust = self._last_backlog = time.monotonic()
+
+    def _respawn(self):
+        """
+        Start the encoder and confirm it came up: a frame arrives, or it is
+        still running, RESTART_SETTLE s later. Retried, since right after a
+        kill the sensor may not have been released yet. False if it never did.
+        """
+        for attempt in range(self.RESTART_TRIES):
+            if attempt:
+                time.sleep(self.RESTART_SETTLE)
+            self._start()
+            jpeg, _ = self.wait_frame(self.frame_seq, timeout=self.RESTART_SETTLE)
+            if jpeg or self.is_available():
+                return True
+        return False
+
+    def set_max_quality(self, quality):
+        """Move the top of the adaptive ladder (e.g. from the dashboard) and jump to it."""
+        self.max_quality = max(self.MIN_QUALITY, min(100, int(quality)))
+        self.set_quality(self.max_quality)
+
+    def report_delivery(self, last_seq, seq):
+        """
+        Called by stream generators after each frame sent, with the seq of the
+        frame that client got before it. Frames in between were missed because
+        its socket was still draining — unless an encoder restart falls in
+        that gap, in which case the stall was ours and isn't counted.
+        """
+        if last_seq <= self._restart_seq or self._restart_lock.locked():
+            return
+        skipped = seq - last_seq - 1
+        now = time.monotonic()
+        self._lag_ema = 0.9 * self._lag_ema + 0.1 * skipped
+        if skipped:
+            self.skipped_frames += skipped
+            self._last_backlog = now
+        if now - self._last_adjust < self.ADAPT_HOLD:
+            return
+        if self._lag_ema > self.LAG_HIGH and self.quality > self.MIN_QUALITY:
+            quality = self.quality - self.QUALITY_STEP
+        elif (self._lag_ema < self.LAG_LOW and now - self._last_backlog > self.ADAPT_RECOVER
+              and self.quality < self.max_quality):
+            quality = min(self.max_quality, self.quality + self.QUALITY_STEP)
+        else:
+            return
+        # The restart blocks for seconds — run it off this viewer's stream, as
+        # on_set_camera_quality does, and hold off other viewers meanwhile
+        self._last_adjust = now
+        socketio.start_background_task(self.set_quality, quality)
 
     def is_available(self):
         return self.running and self.proc is not None and self.proc.poll() is None
@@ -103,7 +296,7 @@ class Camera:
             self.proc.terminate()
 
 
-camera = Camera()
+camera = Camera(device=os.environ.get('CAMERA_DEVICE') or None)
 
 
 # --- Kinect v2 Camera (RGB-only via libfreenect2) ---
@@ -121,7 +314,9 @@ class KinectCamera:
         self.running = False
         self.rgb_enabled = True   # False while robot is moving
         self._proc = None
-        self._new_frame = threading.Event()  # set each time a fresh frame arrives
+        self._latest = (None, 0)    # (jpeg, seq) published as one reference, as in Camera
+        self._waiting = 0           # viewers blocked in wait_frame()
+        self.cond = threading.Condition(self.lock)  # notified on a new frame if anyone waits
         self._start()
 
     def _start(self):
@@ -168,9 +363,11 @@ class KinectCamera:
                 data = self._read_exact(stdout, sz)
                 if data is None:
                     break
-                with self.lock:
-                    self.frame = data
-                self._new_frame.set()  # wake any waiting generators
+                self.frame = data
+                self._latest = (data, self._latest[1] + 1)
+                if self._waiting:
+                    with self.cond:
+                        self.cond.notify_all()
             except Exception as e:
                 print(f"Kinect read error: {e}")
                 break
@@ -180,12 +377,20 @@ class KinectCamera:
         threading.Thread(target=self._retry_loop, daemon=True).start()
 
     def _read_exact(self, fp, n):
-        buf = b''
-        while len(buf) < n:
-            chunk = fp.read(n - len(buf))
-            if not chunk:
+        """
+        Read exactly n bytes straight into one preallocated buffer — the pipe
+        delivers a 1080p JPEG in many short reads, and appending each to a
+        growing bytes object re-copied the whole frame every time.
+        The buffer is never written again once returned.
+        """
+        buf = bytearray(n)
+        view = memoryview(buf)
+        got = 0
+        while got < n:
+            r = fp.readinto(view[got:])
+            if not r:
                 return None
-            buf += chunk
+            got += r
         return buf
 
     def _log_stderr(self):
@@ -196,15 +401,22 @@ class KinectCamera:
         """Return the latest JPEG frame, or None if RGB processing is disabled."""
         if not self.rgb_enabled:
             return None
-        with self.lock:
-            return self.frame
-
-    def wait_for_new_frame(self, timeout: float = 0.5) -> bool:
-        """Block until a fresh frame arrives (or timeout). Returns True if new frame ready."""
-        got = self._new_frame.wait(timeout=timeout)
-        if got:
-            self._new_frame.clear()
-        return got
+        return self.frame  # fresh buffer per frame, swapped by reference — no lock needed to read
+
+    def wait_frame(self, last_seq, timeout=0.5):
+        """
+        Block until a frame newer than last_seq arrives (or timeout).
+        Each viewer tracks its own seq, so one viewer consuming a frame
+        never hides it from another. Returns (jpeg, seq); jpeg is None on timeout.
+        """
+        with self.cond:
+            self._waiting += 1
+            try:
+                if not self.cond.wait_for(lambda: self._latest[1] != last_seq, timeout=timeout):
+                    return None, last_seq
+            finally:
+                self._waiting -= 1
+            return self._latest
 
     def is_available(self):
         return self.running and self.frame is not None
@@ -227,19 +439,36 @@ kinect = KinectCamera()
 
 PIPER_BIN = "/home/alzar/piper/piper/piper"
 PIPER_MODEL = "/home/alzar/piper/voices/en_US-lessac-medium.onnx"
+ELEVENLABS_STREAM_URL = "https://api.elevenlabs.io/v1/text-to-speech/{voice_id}/stream"
+ELEVENLABS_FORMAT = "mp3_22050_32"   # small frames, so the first syllable arrives fast
+# That format is constant 32 kbit/s, so bytes written to ffplay map to play time
+ELEVENLABS_BYTES_PER_SEC = 32000 / 8
+ESPEAK_WPM = 140
+LONG_UTTERANCE_WORDS = 40            # above this, synthesise sentence by sentence
 
 
 class TTS:
     """
     Text-to-speech using ElevenLabs (Matilda, Australian female).
     Falls back to Piper TTS (offline, ARM-native) if ElevenLabs is unavailable.
-    Queued so commentary never overlaps.
+    Queued so commentary never overlaps: the persistent players return as
+    soon as audio is handed over, so the play-out time of what each one has
+    been given is tracked, and a different backend waits for it to finish.
     """
     def __init__(self, api_key: str = None, voice_id: str = None):
-        self.queue = []
-        self.lock = threading.Lock()
-        self.speaking = False
+        self.queue = queue.SimpleQueue()  # utterances for the single worker thread
+        self.lock = threading.Lock()       # guards the subprocess handles below, not the queue
         self.enabled = True
+        self.spoken = 0       # utterances handed to a voice backend
+        self._espeak = None   # long-lived espeak-ng reading stdin, spawned on first use
+        self._child = None    # ffplay/piper subprocess currently running, for stop()
+        self._player = None   # long-lived ffplay fed ElevenLabs MP3 over stdin
+        self._stops = 0       # bumped by stop(), so an utterance in flight knows it was cut off
+        self._output = None   # backend ('elevenlabs' / 'piper' / 'espeak') that spoke last
+        self._audio_until = 0.0  # time.monotonic() when its handed-over audio finishes playing
+        self._fetch = ThreadPoolExecutor(max_workers=2, thread_name_prefix="tts-fetch")
+        self._session = requests.Session()  # keeps the TLS connection to ElevenLabs alive
+        self._session.headers.update({"xi-api-key": api_key or "", "Content-Type": "application/json"})
         self.api_key = api_key
         self.voice_id = voice_id or "XrExE9yKIg1WjnnlVkGX"  # Matilda
         self.use_elevenlabs = bool(api_key)
@@ -250,87 +479,248 @@ class TTS:
             print(f"✅ TTS: Piper (offline)")
         else:
             print(f"✅ TTS: espeak-ng (fallback)")
+        threading.Thread(target=self._process_queue, daemon=True).start()
 
     def speak(self, text, priority=False):
         if not self.enabled:
             return
-        with self.lock:
-            if priority:
-                self.queue.clear()
-            self.queue.append(text)
-        if not self.speaking:
-            threading.Thread(target=self._process_queue, daemon=True).start()
+        if priority:
+            self._drain()
+        self.queue.put(text)
+
+    def _drain(self):
+        """Discard everything still waiting to be spoken."""
+        try:
+            while True:
+                self.queue.get_nowait()
+        except queue.Empty:
+            pass
 
     def _process_queue(self):
-        self.speaking = True
+        """Single long-lived worker — blocks on the queue until there's something to say."""
         while True:
-            with self.lock:
-                if not self.queue:
-                    self.speaking = False
-                    return
-                text = self.queue.pop(0)
+            text = self.queue.get()
+            stops = self._stops   # stop() generation this utterance belongs to
             try:
                 if self.use_elevenlabs:
-                    self._speak_elevenlabs(text)
-                elif self.use_piper:
-                    self._speak_piper(text)
+                    self._speak_elevenlabs(text, stops)
                 else:
-                    self._speak_espeak(text)
+                    self._speak_offline(text, stops)
             except Exception as e:
                 print(f"TTS error: {e}")
-                self._speak_piper(text) if self.use_piper else self._speak_espeak(text)
+                try:
+                    self._speak_offline(text, stops)
+                except Exception as e:
+                    print(f"TTS fallback error: {e}")  # keep the worker alive
+                    continue
+            self.spoken += 1
+
+    def _player_pipe(self) -> subprocess.Popen:
+        """Return the persistent ffplay reading MP3 from stdin, (re)spawning it if it has exited."""
+        if self._player is None or self._player.poll() is not None:
+            self._player = subprocess.Popen(
+                ['ffplay', '-nodisp', '-loglevel', 'quiet', '-f', 'mp3', '-i', 'pipe:0'],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                bufsize=0,
+            )
+        return self._player
 
-    def _speak_elevenlabs(self, text: str):
-        import requests, tempfile, os
-        r = requests.post(
-            f"https://api.elevenlabs.io/v1/text-to-speech/{self.voice_id}",
-            headers={"xi-api-key": self.api_key, "Content-Type": "application/json"},
+    def _elevenlabs_request(self, text: str):
+        return self._session.post(
+            ELEVENLABS_STREAM_URL.format(voice_id=self.voice_id),
+            params={"output_format": ELEVENLABS_FORMAT},
             json={
                 "text": text,
                 "model_id": "eleven_multilingual_v2",
                 "voice_settings": {"stability": 0.5, "similarity_boost": 0.8}
             },
-            timeout=15
+            timeout=15,
+            stream=True,
         )
-        if r.status_code == 200:
-            with tempfile.NamedTemporaryFile(suffix=".mp3", delete=False) as f:
-                f.write(r.content)
-                tmp = f.name
-            subprocess.run(['ffplay', '-nodisp', '-autoexit', tmp],
-                           capture_output=True, timeout=60)
-            os.unlink(tmp)
-        else:
-            print(f"ElevenLabs error {r.status_code}: {r.text[:100]}")
-            self._speak_piper(text) if self.use_piper else self._speak_espeak(text)
 
-    def _speak_piper(self, text: str):
-        import tempfile, os
+    def _fetch_elevenlabs(self, text: str) -> bytes:
+        with self._elevenlabs_request(text) as r:
+            r.raise_for_status()
+            return r.content
+
+    def _play_audio(self, chunks, stops) -> bool:
+        """
+        Write MP3 chunks into the running player. False if stop() was called
+        since the utterance began (stops is the count it started with) or
+        the pipe broke — never respawns a player for audio that was stopped.
+        A stream that fails before any audio is written raises, so the caller
+        can fall back; once some has played, the part is just cut short —
+        falling back would say it again from the start.
+        """
+        if not self._wait_turn('elevenlabs', stops):
+            return False
+        written = False
+        try:
+            player = self._player_pipe()
+            for chunk in chunks:
+                player.stdin.write(chunk)
+                written = True
+                self._queued_audio('elevenlabs', len(chunk) / ELEVENLABS_BYTES_PER_SEC)
+            return True
+        except BrokenPipeError:
+            self._player = None  # respawned on the next utterance
+            return False
+        except requests.RequestException as e:
+            if not written:
+                raise
+            print(f"ElevenLabs stream cut off: {e}")
+            return True
+
+    def _speak_elevenlabs(self, text: str, stops: int):
+        parts = [text]
+        if len(text.split()) > LONG_UTTERANCE_WORDS:
+            parts = [s for s in SENTENCE_END.split(text) if s] or [text]
+        # Later sentences are synthesised in the background while the first
+        # one is already streaming into ffplay; their audio is queued in order.
+        pending = [self._fetch.submit(self._fetch_elevenlabs, p) for p in parts[1:]]
+        try:
+            with self._elevenlabs_request(parts[0]) as r:
+                if r.status_code != 200:
+                    print(f"ElevenLabs error {r.status_code}: {r.text[:100]}")
+                    for f in pending:
+                        f.cancel()
+                    self._speak_offline(text, stops)
+                    return
+                # MP3 goes straight from the socket into the running player —
+                # no temp file, no ffplay start-up per utterance.
+                if not self._play_audio(r.iter_content(4096), stops):
+                    for f in pending:
+                        f.cancel()
+                    return
+        except requests.RequestException:
+            for f in pending:
+                f.cancel()
+            raise  # nothing has played yet — the worker falls back for the whole text
+        for part, f in zip(parts[1:], pending):
+            try:
+                audio = f.result()
+            except Exception as e:
+                print(f"ElevenLabs error: {e}")
+                self._speak_offline(part, stops)
+                continue
+            if not self._play_audio((audio,), stops):
+                return
+
+    def _speak_offline(self, text: str, stops: int):
+        """Piper if it's installed, espeak-ng otherwise — the fallback for ElevenLabs failures."""
+        if self._stops != stops:
+            return  # stop() came in while ElevenLabs was failing
+        if self.use_piper:
+            self._speak_piper(text, stops)
+        else:
+            self._speak_espeak(text, stops)
+
+    def _wait_turn(self, output: str, stops: int) -> bool:
+        """
+        Block until audio already handed to another backend has played out.
+        The same backend needs no wait — its process plays lines/frames in
+        order. False if stop() was called meanwhile.
+        """
+        if output != self._output:
+            while self._stops == stops and (left := self._audio_until - time.monotonic()) > 0:
+                time.sleep(min(left, 0.1))
+        return self._stops == stops
+
+    def _queued_audio(self, output: str, seconds: float):
+        """Record that `seconds` more audio was handed to output's player."""
+        self._output = output
+        self._audio_until = max(self._audio_until, time.monotonic()) + seconds
+
+    def _speak_piper(self, text: str, stops: int):
         with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as f:
             tmp = f.name
         try:
-            subprocess.run(
-                [PIPER_BIN, '--model', PIPER_MODEL, '--output_file', tmp],
-                input=text.encode(), capture_output=True, timeout=30
-            )
-            subprocess.run(['ffplay', '-nodisp', '-autoexit', tmp],
-                           capture_output=True, timeout=60)
+            self._run_child([PIPER_BIN, '--model', PIPER_MODEL, '--output_file', tmp],
+                            stops, timeout=30, input=text.encode())
+            # Let ElevenLabs audio already in the player finish first. stop()
+            # during synthesis only kills piper — whatever it had written so
+            # far is still in the wav, so don't play it
+            if not self._wait_turn('piper', stops):
+                return
+            self._run_child(['ffplay', '-nodisp', '-autoexit', tmp], stops, timeout=60)
+            self._output = 'piper'  # -autoexit: already played out in full
         finally:
             try:
                 os.unlink(tmp)
             except OSError:
                 pass
 
-    def _speak_espeak(self, text: str):
-        subprocess.run(
-            ['espeak-ng', '-v', 'en-us+m3', '-s', '140', '-p', '38', text],
-            timeout=30, capture_output=True
+    def _run_child(self, cmd, stops, timeout, input=None):
+        """Run a synth/player subprocess to completion, tracked so stop() can signal exactly it."""
+        p = subprocess.Popen(
+            cmd,
+            stdin=subprocess.PIPE if input is not None else subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
         )
+        with self.lock:
+            if self._stops != stops:
+                p.kill()  # stop() already swapped _child out — it would never see this one
+            self._child = p
+        try:
+            p.communicate(input, timeout=timeout)
+        except subprocess.TimeoutExpired:
+            p.kill()
+            p.wait()
+            raise
+        finally:
+            with self.lock:
+                if self._child is p:
+                    self._child = None
+
+    def _espeak_pipe(self) -> subprocess.Popen:
+        """
+        Return the persistent espeak-ng process, (re)spawning it if it has exited.
+        No text argument and no --stdin: --stdin slurps everything up to EOF
+        before speaking, while plain stdin input is spoken line by line.
+        """
+        if self._espeak is None or self._espeak.poll() is not None:
+            self._espeak = subprocess.Popen(
+                ['espeak-ng', '-v', 'en-us+m3', '-s', str(ESPEAK_WPM), '-p', '38'],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+        return self._espeak
+
+    def _speak_espeak(self, text: str, stops: int):
+        # One line per utterance — espeak speaks each line as it arrives,
+        # so there's no fork/exec or voice load per sentence.
+        words = text.split()
+        line = (' '.join(words) + '\n').encode()
+        if not self._wait_turn('espeak', stops):
+            return
+        try:
+            p = self._espeak_pipe()
+            p.stdin.write(line)
+            p.stdin.flush()
+        except BrokenPipeError:
+            self._espeak = None
+            p = self._espeak_pipe()
+            p.stdin.write(line)
+            p.stdin.flush()
+        self._queued_audio('espeak', len(words) * 60 / ESPEAK_WPM)  # estimate: espeak keeps to -s wpm
 
     def stop(self):
+        self._drain()
+        self._stops += 1
+        self._audio_until = 0.0  # everything handed over is killed below
         with self.lock:
-            self.queue.clear()
-        subprocess.run(['pkill', '-f', 'ffplay'], capture_output=True)
-        subprocess.run(['pkill', '-f', 'espeak-ng'], capture_output=True)
+            child, self._child = self._child, None
+            player, self._player = self._player, None
+            p, self._espeak = self._espeak, None
+        # Killing the persistent players drops whatever they still have
+        # buffered; they're respawned on the next utterance.
+        for proc in (child, player, p):
+            if proc and proc.poll() is None:
+                proc.terminate()
 
 
 tts = TTS(
@@ -343,7 +733,8 @@ tts = TTS(
 
 _openai_key = os.environ.get('OPENAI_API_KEY')
 if _openai_key:
-    vision = VisionAI(api_key=_openai_key)
+    vision = VisionAI(api_key=_openai_key,
+                      survey_threshold=int(os.environ.get('SURVEY_PHASH_THRESHOLD', PHASH_THRESHOLD)))
     print("✅ Vision AI ready (GPT-4o-mini)")
 else:
     vision = None
@@ -366,34 +757,127 @@ robot_state = {
     "kinect_mode": "stationary",  # stationary | moving
 }
 
-commentary_log = []
+# --- Coalesced state broadcast ---
+# Handlers mark the state dirty instead of emitting directly; one background
+# task flushes at most one state_update per window, so a burst of joystick
+# moves or mode changes becomes a single broadcast.
+
+STATE_FLUSH_INTERVAL = 0.05  # seconds
+_state_dirty = threading.Event()
+_state_version = 0
+_state_cache = (-1, None)   # (version, serialized robot_state)
+
+def mark_state_dirty():
+    global _state_version
+    _state_version += 1
+    _state_dirty.set()
+
+def state_json():
+    """robot_state as JSON bytes, serialized once per change rather than once per poll."""
+    global _state_cache
+    version = _state_version
+    if _state_cache[0] != version:
+        # Tagged with the version read *before* dumping, so a change that lands
+        # mid-serialization just forces a rebuild on the next call.
+        _state_cache = (version, orjson.dumps(robot_state))
+    return _state_cache[1]
+
+def _state_flush_loop():
+    while True:
+        _state_dirty.wait()
+        socketio.sleep(STATE_FLUSH_INTERVAL)  # let the rest of the burst land
+        _state_dirty.clear()
+        socketio.emit('state_update', robot_state)
+
+socketio.start_background_task(_state_flush_loop)
+
+commentary_log = deque(maxlen=500)  # oldest entries fall off in O(1)
+
+
+_commentary_version = 0
+_commentary_cache = (-1, None)   # (version, serialized last-50 entries)
+
+
+def recent_commentary(n):
+    """Last n commentary entries, oldest first — walks only those n from the right end."""
+    recent = list(islice(reversed(commentary_log), n))
+    recent.reverse()
+    return recent
+
+
+def commentary_json():
+    """Last 50 entries as JSON bytes, rebuilt only after add_commentary."""
+    global _commentary_cache
+    version = _commentary_version
+    if _commentary_cache[0] != version:
+        _commentary_cache = (version, orjson.dumps(recent_commentary(50)))
+    return _commentary_cache[1]
 
 
 # --- Routes ---
 
 @app.route('/')
 def index():
-    return render_template('index.html')
+    return render_template('index.html', stream_base=_stream_base())
+
+def _stream_base():
+    """Origin of the standalone MJPEG server as seen by this client ('' = same origin)."""
+    if not (mjpeg_server and mjpeg_server.running):
+        return ''
+    host = urlsplit('//' + request.host).hostname
+    if ':' in host:
+        host = f'[{host}]'  # IPv6 literal
+    return f'//{host}:{mjpeg_server.port}'
 
 @app.route('/api/state')
 def get_state():
-    return jsonify(robot_state)
+    return Response(state_json(), mimetype='application/json')
 
 @app.route('/api/commentary')
 def get_commentary():
-    return jsonify(commentary_log[-50:])  # Last 50 entries
+    return Response(commentary_json(), mimetype='application/json')
 
-@app.route('/video_feed')
-def video_feed():
-    """MJPEG stream from the ground camera."""
-    def generate():
+def mjpeg_part(jpeg):
+    """
+    Frame one JPEG as a multipart chunk in a single allocation, so it goes out
+    as one write. Content-Length lets clients read the part without scanning
+    for the next boundary.
+    """
+    return b'--frame\r\nContent-Type: image/jpeg\r\nContent-Length: %d\r\n\r\n%b\r\n' % (len(jpeg), jpeg)
+
+_framed = {}  # source -> (seq, part): the newest frame, framed once for every viewer
+
+def shared_part(source, jpeg, seq):
+    """
+    mjpeg_part(), memoised per frame — with several viewers open, the
+    first to reach a frame frames it and the rest reuse those bytes.
+    """
+    cached = _framed.get(source)
+    if cached and cached[0] == seq:
+        return cached[1]
+    part = mjpeg_part(jpeg)
+    _framed[source] = (seq, part)
+    return part
+
+def camera_stream():
+    """Multipart MJPEG chunks from the ground camera, one per captured frame."""
+    # Latest-frame-wins: a slow client simply skips to the newest frame
+    # (counted in skipped_frames) rather than queueing stale ones.
+    last_seq = 0
+    with camera.lock:
+        camera.viewers += 1
+    try:
         while True:
-            jpeg = camera.get_jpeg()
+            # Paced by the capture thread — wakes once per new frame, never resends
+            jpeg, seq = camera.wait_frame(last_seq)
             if jpeg:
-                yield (b'--frame\r\n'
-                       b'Content-Type: image/jpeg\r\n\r\n' + jpeg + b'\r\n')
-            time.sleep(0.033)  # ~30 fps
-    return Response(generate(), mimetype='multipart/x-mixed-replace; boundary=frame')
+                if last_seq:
+                    camera.report_delivery(last_seq, seq)
+                last_seq = seq
+                yield shared_part('camera', jpeg, seq)
+    finally:
+        with camera.lock:
+            camera.viewers -= 1
 
 def _make_placeholder_jpeg(width=320, height=180, text="Kinect initialising\u2026"):
     """Generate a dark placeholder JPEG using numpy + cv2."""
@@ -405,41 +889,92 @@ def _make_placeholder_jpeg(width=320, height=180, text="Kinect initialising\u202
     _, buf = cv2.imencode('.jpg', img, [cv2.IMWRITE_JPEG_QUALITY, 60])
     return buf.tobytes()
 
-_KINECT_PLACEHOLDER = None  # lazily generated
+_KINECT_PLACEHOLDER = None  # lazily generated, stored already framed
 
-@app.route('/kinect_feed')
-def kinect_feed():
-    """MJPEG stream from the Kinect v2 RGB camera."""
+def kinect_stream():
+    """Multipart MJPEG chunks from the Kinect v2 RGB camera, with a placeholder while paused."""
     global _KINECT_PLACEHOLDER
     if _KINECT_PLACEHOLDER is None:
         try:
-            _KINECT_PLACEHOLDER = _make_placeholder_jpeg()
+            _KINECT_PLACEHOLDER = mjpeg_part(_make_placeholder_jpeg())
         except Exception:
             pass
 
-    def generate():
-        while True:
-            if kinect.rgb_enabled:
-                # Block until a genuinely new frame arrives (max 0.5s)
-                kinect.wait_for_new_frame(timeout=0.5)
-                jpeg = kinect.get_jpeg()
-                if jpeg:
-                    yield (b'--frame\r\n'
-                           b'Content-Type: image/jpeg\r\n\r\n' + jpeg + b'\r\n')
-                    continue
-            # rgb disabled or no frame yet — send placeholder to keep connection alive
-            if _KINECT_PLACEHOLDER:
-                yield (b'--frame\r\n'
-                       b'Content-Type: image/jpeg\r\n\r\n' + _KINECT_PLACEHOLDER + b'\r\n')
-            time.sleep(0.5)
-    return Response(generate(), mimetype='multipart/x-mixed-replace; boundary=frame')
+    last_seq = 0
+    while True:
+        if kinect.rgb_enabled:
+            # Block until a frame this viewer hasn't sent yet arrives (max 0.5s)
+            jpeg, last_seq = kinect.wait_frame(last_seq, timeout=0.5)
+            if jpeg and kinect.rgb_enabled:
+                yield shared_part('kinect', jpeg, last_seq)
+                continue
+            if kinect.is_available():
+                continue  # just a slow frame — keep waiting rather than resending
+        # rgb disabled or no frame yet — send placeholder to keep connection alive
+        if _KINECT_PLACEHOLDER:
+            yield _KINECT_PLACEHOLDER
+        time.sleep(0.5)
+
+# With MJPEG_PORT set, streams are served by a standalone MJPEG server on
+# that port. Otherwise — or if the port can't be bound — the dashboard uses
+# the same-origin Flask routes below.
+mjpeg_server = None
+if os.environ.get('MJPEG_PORT'):
+    mjpeg_server = MJPEGServer({'/video_feed': camera_stream, '/kinect_feed': kinect_stream},
+                               port=int(os.environ['MJPEG_PORT']))
+    mjpeg_server.start()
+
+@app.route('/video_feed')
+def video_feed():
+    """MJPEG stream from the ground camera."""
+    return Response(camera_stream(), mimetype=MJPEG_MIMETYPE)
+
+@app.route('/kinect_feed')
+def kinect_feed():
+    """MJPEG stream from the Kinect v2 RGB camera."""
+    return Response(kinect_stream(), mimetype=MJPEG_MIMETYPE)
 
 @app.route('/api/camera_status')
 def camera_status():
-    return jsonify({
+    return Response(orjson.dumps({
         "available": camera.is_available(),
         "kinect_available": kinect.is_available(),
-    })
+        "quality": camera.quality,
+        "max_quality": camera.max_quality,
+        "viewers": camera.viewers,
+        "frames_captured": camera.frame_seq,
+        "dropped_frames": camera.dropped_frames,
+        "skipped_frames": camera.skipped_frames,
+    }), mimetype='application/json')
+
+# --- Metrics ---
+
+ws_clients = 0
+
+class _RobotCollector:
+    """Reads live counters at scrape time — nothing is updated on the hot paths."""
+    def collect(self):
+        yield GaugeMetricFamily('camera_capture_fps', 'Measured ground-camera frame rate', value=camera.capture_fps)
+        yield GaugeMetricFamily('camera_target_fps', 'Configured ground-camera frame rate', value=camera.FPS)
+        yield GaugeMetricFamily('camera_jpeg_quality', 'Current rpicam-vid MJPEG quality', value=camera.quality)
+        yield GaugeMetricFamily('camera_viewers', 'Open /video_feed streams', value=camera.viewers)
+        yield CounterMetricFamily('camera_frames', 'Frames captured', value=camera.frame_seq)
+        yield CounterMetricFamily('camera_dropped_frames', 'Frames overwritten before any viewer took them', value=camera.dropped_frames)
+        yield CounterMetricFamily('camera_skipped_frames', 'Frames missed by slow viewers', value=camera.skipped_frames)
+        yield GaugeMetricFamily('tts_queue_depth', 'Utterances waiting to be spoken', value=tts.queue.qsize())
+        yield CounterMetricFamily('tts_spoken', 'Utterances spoken', value=tts.spoken)
+        yield GaugeMetricFamily('ws_clients_connected', 'Connected dashboard sockets', value=ws_clients)
+        yield GaugeMetricFamily('commentary_log_size', 'Entries held in the commentary log', value=len(commentary_log))
+        if vision:
+            yield CounterMetricFamily('vision_survey_cache_hits', 'Scene surveys reused from a similar view', value=vision.survey_hits)
+            yield CounterMetricFamily('vision_survey_cache_misses', 'Scene surveys sent to the API', value=vision.survey_misses)
+
+REGISTRY.register(_RobotCollector())
+
+@app.route('/metrics')
+def metrics():
+    """Prometheus text-format exposition."""
+    return Response(generate_latest(), mimetype=CONTENT_TYPE_LATEST)
 
 @app.route('/docs')
 def docs():
@@ -454,12 +989,16 @@ def hardware():
 
 @socketio.on('connect')
 def on_connect():
+    global ws_clients
+    ws_clients += 1
     print(f'Client connected')
     emit('state_update', robot_state)
-    emit('commentary_history', commentary_log[-20:])
+    emit('commentary_history', recent_commentary(20))
 
 @socketio.on('disconnect')
 def on_disconnect():
+    global ws_clients
+    ws_clients -= 1
     print(f'Client disconnected')
 
 @socketio.on('set_mode')
@@ -470,7 +1009,7 @@ def on_set_mode(data):
         if vision:
             vision.set_cooldown(mode)
             vision.reset_scene()  # re-survey with new object count
-        socketio.emit('state_update', robot_state)
+        mark_state_dirty()
         add_commentary(f"Switched to {mode} mode.", "system")
 
 @socketio.on('set_camera')
@@ -478,7 +1017,7 @@ def on_set_camera(data):
     camera = data.get('camera', 'ground')
     if camera in ('ground', 'drone', 'kinect'):
         robot_state['camera'] = camera
-        socketio.emit('state_update', robot_state)
+        mark_state_dirty()
 
 @socketio.on('set_kinect_mode')
 def on_set_kinect_mode(data):
@@ -488,7 +1027,7 @@ def on_set_kinect_mode(data):
         return
     robot_state['kinect_mode'] = mode
     kinect.set_rgb_enabled(mode == 'stationary')
-    socketio.emit('state_update', robot_state)
+    mark_state_dirty()
     label = "stationary — RGB processing active" if mode == 'stationary' else "moving — RGB processing paused"
     add_commentary(f"Kinect mode: {label}.", "system")
 
@@ -496,34 +1035,43 @@ def on_set_kinect_mode(data):
 def on_drone_launch():
     if robot_state['drone']['status'] == 'docked':
         robot_state['drone']['status'] = 'launching'
-        socketio.emit('state_update', robot_state)
+        mark_state_dirty()
         add_commentary("Launching drone for aerial reconnaissance.", "system")
         # Simulate launch sequence
         def complete_launch():
-            time.sleep(3)
+            socketio.sleep(3)
             robot_state['drone']['status'] = 'airborne'
-            socketio.emit('state_update', robot_state)
+            mark_state_dirty()
             add_commentary("Drone is airborne. Switching to aerial view.", "alzar")
-        threading.Thread(target=complete_launch, daemon=True).start()
+        socketio.start_background_task(complete_launch)
 
 @socketio.on('drone_return')
 def on_drone_return():
     if robot_state['drone']['status'] == 'airborne':
         robot_state['drone']['status'] = 'returning'
-        socketio.emit('state_update', robot_state)
+        mark_state_dirty()
         add_commentary("Recalling drone.", "system")
         def complete_return():
-            time.sleep(5)
+            socketio.sleep(5)
             robot_state['drone']['status'] = 'docked'
-            socketio.emit('state_update', robot_state)
+            mark_state_dirty()
             add_commentary("Drone docked safely.", "system")
-        threading.Thread(target=complete_return, daemon=True).start()
+        socketio.start_background_task(complete_return)
+
+@socketio.on('set_camera_quality')
+def on_set_camera_quality(data):
+    try:
+        quality = int(data.get('quality'))
+    except (TypeError, ValueError):
+        return
+    # Restarting the encoder blocks for up to 2s — keep it off the event handler
+    socketio.start_background_task(camera.set_max_quality, quality)
 
 @socketio.on('move')
 def on_move(data):
     direction = data.get('direction')
     robot_state['moving'] = direction is not None
-    socketio.emit('state_update', robot_state)
+    mark_state_dirty()
 
 @socketio.on('request_commentary')
 def on_request_commentary(data):
@@ -536,9 +1084,10 @@ def on_request_commentary(data):
         if vision and camera.is_available():
             jpeg = camera.get_jpeg()
             if jpeg:
-                text = vision.observe(jpeg, question=question)
+                # Answer is spoken sentence by sentence as it streams in
+                text = vision.observe(jpeg, question=question, on_sentence=tts.speak)
                 if text:
-                    add_commentary(text, "alzar")
+                    add_commentary(text, "alzar", speak=False)
                     return
         add_commentary("I can't see anything right now — camera or AI unavailable.", "alzar")
 
@@ -550,18 +1099,55 @@ def on_request_commentary(data):
 
 # --- Helpers ---
 
-def add_commentary(text, source="alzar"):
-    entry = {
-        "text": text,
-        "source": source,
-        "timestamp": time.strftime("%H:%M:%S"),
-    }
-    commentary_log.append(entry)
-    if len(commentary_log) > 500:
-        commentary_log.pop(0)
-    socketio.emit('commentary', entry)
+# Commentary is broadcast in batches: entries queue here and one task sends
+# them as a single 'commentary_batch' frame per flush window.
+COMMENTARY_FLUSH_INTERVAL = 0.05  # seconds
+_commentary_buf = []
+_commentary_lock = threading.Lock()
+_commentary_dirty = threading.Event()
+
+def _commentary_flush_loop():
+    while True:
+        _commentary_dirty.wait()
+        socketio.sleep(COMMENTARY_FLUSH_INTERVAL)
+        _commentary_dirty.clear()
+        with _commentary_lock:
+            batch = _commentary_buf[:]
+            _commentary_buf.clear()
+        if batch:
+            socketio.emit('commentary_batch', batch)
+
+socketio.start_background_task(_commentary_flush_loop)
+
+_clock_second = None   # epoch second _clock_str was formatted for
+_clock_str = ""
+
+def _clock():
+    """HH:MM:SS for now, formatted (localtime + strftime) at most once per second."""
+    global _clock_second, _clock_str
+    now = int(time.time())
+    if now != _clock_second:
+        _clock_str = time.strftime("%H:%M:%S", time.localtime(now))
+        _clock_second = now
+    return _clock_str
+
+def add_commentary(text, source="alzar", speak=True):
+    global _commentary_version
+    with _commentary_lock:
+        # The version doubles as the entry id, so clients can drop a batched
+        # entry they already got in the history sent on connect
+        _commentary_version += 1
+        entry = {
+            "id": _commentary_version,
+            "text": text,
+            "source": source,
+            "timestamp": _clock(),
+        }
+        commentary_log.append(entry)
+        _commentary_buf.append(entry)
+    _commentary_dirty.set()
     # Speak aloud — only Alzar's own commentary, not system messages or user input
-    if source == "alzar":
+    if source == "alzar" and speak:
         tts.speak(text)
 
 
@@ -574,7 +1160,7 @@ def on_reset_scene():
 @socketio.on('set_tts')
 def on_set_tts(data):
     tts.enabled = data.get('enabled', True)
-    socketio.emit('state_update', robot_state)
+    mark_state_dirty()
 
 @socketio.on('tts_stop')
 def on_tts_stop():
@@ -588,11 +1174,15 @@ def vision_loop():
     Frequency is controlled by vision.cooldown (set by talk mode).
     """
     print("Vision loop: waiting 5s for warmup...")
-    time.sleep(5)
+    socketio.sleep(5)
     print("Vision loop: starting observation cycle")
+    last_seq = 0
     while True:
         try:
-            time.sleep(3)
+            # Wake when the cooldown ends (the prefetched comment is usually
+            # already waiting), but re-check mode/camera at least every 3s
+            due = vision.seconds_until_due() if vision else 3
+            socketio.sleep(min(3, max(0.2, due)))
             if robot_state['mode'] == 'quiet':
                 continue
             if not vision:
@@ -601,9 +1191,11 @@ def vision_loop():
             if not camera.is_available():
                 print("Vision loop: camera not available")
                 continue
-            jpeg = camera.get_jpeg()
+            # Same shared bytes the viewers get — but only a frame we haven't
+            # already observed, so a stalled camera never costs an API call
+            jpeg, last_seq = camera.wait_frame(last_seq)
             if not jpeg:
-                print("Vision loop: no jpeg frame")
+                print("Vision loop: no fresh jpeg frame")
                 continue
             text = vision.observe(jpeg)
             if text:
@@ -612,10 +1204,10 @@ def vision_loop():
         except Exception as e:
             print(f"Vision loop error: {e}")
 
-threading.Thread(target=vision_loop, daemon=True).start()
+socketio.start_background_task(vision_loop)
 
 # --- GPS ---
-gps = GPSReader(robot_state, socketio=socketio)
+gps = GPSReader(robot_state, on_update=mark_state_dirty)
 gps.start()
 print("✅ Vision loop started")
 
@@ -84,7 +84,10 @@ int main(int, char **) {
         return 1;
     }
 
+    // Output buffer sized once for the worst case and reused with
+    // TJFLAG_NOREALLOC, so the encoder never reallocates mid-stream.
     unsigned char *jpeg_buf = nullptr;
+    unsigned long  jpeg_cap = 0;
     unsigned long  jpeg_sz  = 0;
 
     while (!g_shutdown) {
@@ -94,6 +97,19 @@ int main(int, char **) {
 
         libfreenect2::Frame *rgb = frames[libfreenect2::Frame::Color];
 
+        unsigned long need = tjBufSize((int)rgb->width, (int)rgb->height, TJSAMP_420);
+        if (need > jpeg_cap) {
+            if (jpeg_buf) tjFree(jpeg_buf);
+            jpeg_buf = tjAlloc((int)need);
+            jpeg_cap = jpeg_buf ? need : 0;
+            if (!jpeg_buf) {
+                std::cerr << "TurboJPEG buffer alloc failed." << std::endl;
+                listener.release(frames);
+                break;
+            }
+        }
+        jpeg_sz = jpeg_cap;
+
         // Kinect RGB frame: BGRX, 4 bytes/pixel, 1920x1080
         // TurboJPEG: compress BGRA → JPEG
         int rc = tjCompress2(
@@ -104,7 +120,7 @@ int main(int, char **) {
             &jpeg_buf, &jpeg_sz,
             TJSAMP_420,
             78,             // JPEG quality (78 is a good bandwidth/quality balance)
-            TJFLAG_FASTDCT
+            TJFLAG_FASTDCT | TJFLAG_NOREALLOC
         );
 
         listener.release(frames);
@@ -15,9 +15,11 @@ GPS_TIMEOUT = 2   # seconds per readline
 
 
 class GPSReader:
-    def __init__(self, robot_state: dict, socketio=None, port=GPS_PORT, baud=GPS_BAUD):
+    def __init__(self, robot_state: dict, socketio=None, port=GPS_PORT, baud=GPS_BAUD,
+                 on_update=None):
         self.robot_state = robot_state
         self.socketio    = socketio
+        self.on_update   = on_update   # preferred over socketio: lets the app coalesce emits
         self.port        = port
         self.baud        = baud
         self.running     = False
@@ -85,6 +87,7 @@ class GPSReader:
                 # Update sats count even without fix
                 self.robot_state["gps"]["fix"] = 0
                 self.robot_state["gps"]["sats"] = int(msg.num_sats or 0)
+                self._broadcast()
 
     @staticmethod
     def _hdop_to_metres(hdop_str) -> float:
@@ -96,5 +99,7 @@ class GPSReader:
 
     def _broadcast(self):
         """Push state_update to all connected WebSocket clients."""
-        if self.socketio:
+        if self.on_update:
+            self.on_update()
+        elif self.socketio:
             self.socketio.emit("state_update", self.robot_state)
@@ -0,0 +1,75 @@
+"""
+MJPEG Stream Server — Alzar Robot Companion
+Serves the camera streams from a standalone ThreadingHTTPServer on its
+own port, so long-lived viewer connections never tie up the Flask /
+SocketIO server that handles the REST API and dashboard sockets.
+"""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+MJPEG_HOST = "0.0.0.0"
+MJPEG_PORT = 5001
+MJPEG_MIMETYPE = "multipart/x-mixed-replace; boundary=frame"
+
+
+class MJPEGServer:
+    def __init__(self, streams: dict, host=MJPEG_HOST, port=MJPEG_PORT):
+        """
+        streams maps a URL path (e.g. "/video_feed") to a zero-argument
+        callable returning a generator of ready-framed multipart chunks.
+        """
+        self.streams  = streams
+        self.host     = host
+        self.port     = port
+        self.running  = False
+        self._server  = None
+        self._thread  = None
+
+    def start(self):
+        try:
+            self._server = ThreadingHTTPServer((self.host, self.port), self._make_handler())
+        except OSError as e:
+            print(f"⚠️  MJPEG server not started on :{self.port}: {e}")
+            return
+        self._server.daemon_threads = True
+        self.running = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True, name="mjpeg-server")
+        self._thread.start()
+        print(f"📺 MJPEG server on :{self.port} — {', '.join(self.streams)}")
+
+    def stop(self):
+        self.running = False
+        if self._server:
+            self._server.shutdown()
+
+    # ------------------------------------------------------------------
+    # Internal
+    # ------------------------------------------------------------------
+
+    def _make_handler(self):
+        streams = self.streams
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                factory = streams.get(self.path.split("?", 1)[0])
+                if factory is None:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", MJPEG_MIMETYPE)
+                self.send_header("Cache-Control", "no-cache, private")
+                self.end_headers()
+                parts = factory()
+                try:
+                    for part in parts:
+                        self.wfile.write(part)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # viewer went away
+                finally:
+                    parts.close()  # run the generator's cleanup (viewer counts etc.)
+
+            def log_message(self, format, *args):
+                pass  # one line per viewer per reconnect is just noise
+
+        return Handler
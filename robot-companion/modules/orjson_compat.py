@@ -0,0 +1,21 @@
+"""
+orjson shim for Flask-SocketIO
+python-socketio encodes every packet with `json.dumps` / `json.loads` from
+whichever module it is handed. This exposes the same two functions backed
+by orjson, returning str as the packet encoder expects.
+"""
+
+import json
+import orjson
+
+
+def dumps(obj, *args, **kwargs) -> str:
+    try:
+        return orjson.dumps(obj).decode()
+    except TypeError:
+        # orjson rejects a few things stdlib json takes (e.g. int dict keys)
+        return json.dumps(obj, *args, **kwargs)
+
+
+def loads(s, *args, **kwargs):
+    return orjson.loads(s)
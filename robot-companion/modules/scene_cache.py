@@ -0,0 +1,59 @@
+"""
+Scene Cache — Alzar Robot Companion
+Remembers scene surveys on disk, keyed by the frame's perceptual hash, so
+a room Alzar has already surveyed is recognised after a restart without
+another API call.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+SCENE_CACHE_PATH = os.path.expanduser("~/.alzar/commentary.db")
+SCENE_CACHE_DAYS = 30
+
+
+def _signed(h: int) -> int:
+    """SQLite INTEGER is signed 64-bit; store the hash's bit pattern as such."""
+    return h - (1 << 64) if h >= 1 << 63 else h
+
+
+class SceneCache:
+    def __init__(self, path=SCENE_CACHE_PATH, max_age_days=SCENE_CACHE_DAYS):
+        self.lock = threading.Lock()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS surveys ("
+            "phash INTEGER, model TEXT, objects TEXT, ts REAL, PRIMARY KEY (phash, model))"
+        )
+        self._db.execute("DELETE FROM surveys WHERE ts < ?", (time.time() - max_age_days * 86400,))
+        print(f"✅ Scene cache: {path}")
+
+    def lookup(self, h: int, n: int, model: str, threshold: int) -> tuple[list[str], int] | None:
+        """
+        (objects, distance) for the nearest stored survey within `threshold`
+        bits of h that listed at least n objects. SQLite can't popcount, so
+        the (small, pruned) table is scanned here.
+        """
+        with self.lock:
+            rows = self._db.execute("SELECT phash, objects FROM surveys WHERE model = ?", (model,)).fetchall()
+        best = None
+        for stored, objects in rows:
+            d = ((h ^ stored) & 0xFFFFFFFFFFFFFFFF).bit_count()
+            if d < threshold and (best is None or d < best[1]):
+                objects = json.loads(objects)
+                if len(objects) >= n:
+                    best = (objects, d)
+        return best
+
+    def store(self, h: int, objects: list[str], model: str):
+        with self.lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO surveys (phash, model, objects, ts) VALUES (?, ?, ?, ?)",
+                (_signed(h), model, json.dumps(objects), time.time()),
+            )
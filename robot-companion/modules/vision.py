@@ -5,10 +5,25 @@ using GPT-4o vision. The AI responds as Alzar — a knowledgeable,
 curious travel companion.
 """
 
-import base64
+import hashlib
+import json
+import re
+import sqlite3
+try:
+    import pybase64 as base64  # SIMD (NEON/AVX2) encoder, same API as the stdlib module
+except ImportError:
+    import base64
 import time
 import threading
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+import cv2
+import httpx
+import numpy as np
+import orjson
 from openai import OpenAI
+from modules.scene_cache import SceneCache
 
 # System prompt — Alzar's personality and role
 SYSTEM_PROMPT = """You are Alzar, an AI travel companion on a small robot. Sharp, curious, witty.
@@ -20,146 +35,495 @@ STRICT RULES:
 - Find the interesting angle — skip the obvious
 - Dry humour welcome when it fits naturally"""
 
+SURVEY_PROMPT = (
+    "You are a sharp observer. Your job is to survey a scene and identify "
+    "the most interesting physical objects to comment on, then open the "
+    "commentary on the first of them in Alzar's voice.\n\n" + SYSTEM_PROMPT
+)
+
+SURVEY_TEXT = (
+    "Find the {n} most interesting distinct physical objects visible, "
+    "ranked from most to least interesting, 1-4 words each. "
+    "Reply with ONLY a JSON object: "
+    '{{"objects": ["gaming PC", "wooden desk", "dual monitors"], '
+    '"first_commentary": "<your comment on the first object>"}}'
+)
+COMMENT_TEXT = "Comment specifically on the {obj}. 1-3 sentences, be insightful and concise."
+
+# Message dicts that never change are built once and shared by every request
+_SURVEY_SYSTEM = {"role": "system", "content": SURVEY_PROMPT}
+_COMMENT_SYSTEM = {"role": "system", "content": SYSTEM_PROMPT}
+
+
+@lru_cache(maxsize=None)
+def _survey_text(n: int) -> dict:
+    """The survey instruction for n objects — n only takes a few values (talk modes)."""
+    return {"type": "text", "text": SURVEY_TEXT.format(n=n)}
+
+
+# Observations are >= 12 s apart; httpx's default 5 s keep-alive would drop the
+# pooled connection between every call and pay a fresh TLS handshake each time
+OPENAI_KEEPALIVE = 120
+
+# _chat() bypasses the SDK, so it carries the SDK's retry policy itself:
+# two retries on rate limits, server errors and dropped connections
+CHAT_RETRIES = 2
+CHAT_BACKOFF = 0.5       # s before the first retry, doubled each time
+CHAT_MAX_BACKOFF = 8.0   # cap, also applied to a server's Retry-After
+RETRY_STATUS = frozenset({408, 409, 429, 500, 502, 503, 504})
+
+# Where a reply can be cut into speakable pieces (also used by the TTS splitter)
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+# "1." / "2)" numbering on a survey line that came back as a plain list
+NUM_PREFIX = re.compile(r"^\s*\d+[.)]\s*")
+
+# Answers kept for repeat questions about the same frame (LRU)
+RESPONSE_CACHE_SIZE = 128
+# ...and for the same question about a near-identical frame (linear Hamming scan)
+PHASH_CACHE_SIZE = 32
+
+# Talk mode → seconds between automatic observations / objects covered per scene
+MODE_COOLDOWN = {
+    "talkative": 12,
+    "normal":    30,
+    "quiet":    999,
+}
+MODE_MAX_OBJECTS = {
+    "talkative": 6,
+    "normal":    3,
+    "quiet":     0,
+}
+
+# Queued objects are commented on concurrently — one worker per object
+PREFETCH_WORKERS = max(MODE_MAX_OBJECTS.values())
+
+# GPT-4o-mini's "low" detail only looks at a 512x512 tile — don't upload more than that
+VISION_MAX_SIDE = 512
+VISION_JPEG_Q = 60
+
+DATA_URL_PREFIX = b"data:image/jpeg;base64,"
+
+# Frames whose perceptual hashes differ in fewer bits than this are "the same view"
+PHASH_THRESHOLD = 6
+
+
+def phash(jpeg_bytes: bytes | memoryview) -> int | None:
+    """
+    64-bit DCT perceptual hash of a JPEG. Decoded at 1/8 scale in grayscale
+    (libjpeg does that in the DCT domain, so it's nearly free), squashed to
+    32x32, and the low-frequency 8x8 block binarised against its median.
+    """
+    img = cv2.imdecode(np.frombuffer(jpeg_bytes, np.uint8), cv2.IMREAD_REDUCED_GRAYSCALE_8)
+    if img is None:
+        return None
+    small = cv2.resize(img, (32, 32), interpolation=cv2.INTER_AREA)
+    low = cv2.dct(np.float32(small))[:8, :8]
+    bits = low > np.median(low)
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}  # not DHT / JPG / DAC
+_REDUCED_DECODE = ((8, cv2.IMREAD_REDUCED_COLOR_8),
+                   (4, cv2.IMREAD_REDUCED_COLOR_4),
+                   (2, cv2.IMREAD_REDUCED_COLOR_2))
+
+
+def jpeg_size(jpeg_bytes: bytes | memoryview) -> tuple[int, int] | None:
+    """(width, height) read from the JPEG's SOF header — no decode."""
+    data = memoryview(jpeg_bytes)
+    i, n = 2, len(data)
+    while i + 9 < n:
+        if data[i] != 0xFF:
+            return None
+        marker = data[i + 1]
+        if marker == 0xFF:  # fill byte
+            i += 1
+            continue
+        if marker in _SOF_MARKERS:
+            return data[i + 7] << 8 | data[i + 8], data[i + 5] << 8 | data[i + 6]
+        i += 2 + (data[i + 2] << 8 | data[i + 3])
+    return None
+
+
+def shrink_jpeg(jpeg_bytes: bytes | memoryview) -> bytes | memoryview:
+    """
+    Downscale a camera JPEG to VISION_MAX_SIDE on the long side and
+    recompress at VISION_JPEG_Q. Returns the encoder's buffer as a
+    memoryview (no copy), or the input unchanged if it's already small.
+    The decode itself is reduced by libjpeg (1/2, 1/4, 1/8 in the DCT
+    domain) as far as it can go without dropping below the target, so a
+    1080p frame is decoded at 960x540 rather than in full.
+    """
+    flag = cv2.IMREAD_COLOR
+    size = jpeg_size(jpeg_bytes)
+    if size:
+        if max(size) <= VISION_MAX_SIDE:
+            return jpeg_bytes
+        flag = next((f for r, f in _REDUCED_DECODE if max(size) // r >= VISION_MAX_SIDE), flag)
+    img = cv2.imdecode(np.frombuffer(jpeg_bytes, np.uint8), flag)
+    if img is None:
+        return jpeg_bytes
+    h, w = img.shape[:2]
+    scale = VISION_MAX_SIDE / max(h, w)
+    if scale >= 1:
+        return jpeg_bytes
+    small = cv2.resize(img, (round(w * scale), round(h * scale)), interpolation=cv2.INTER_AREA)
+    ok, buf = cv2.imencode(".jpg", small, [cv2.IMWRITE_JPEG_QUALITY, VISION_JPEG_Q,
+                                           cv2.IMWRITE_JPEG_OPTIMIZE, 1])
+    return memoryview(buf) if ok else jpeg_bytes
+
+
+def _retry_after(response: httpx.Response, default: float) -> float:
+    """Seconds to wait before retrying: the server's Retry-After if it gave one, capped."""
+    try:
+        wait = float(response.headers.get("retry-after", default))
+    except ValueError:  # HTTP-date form — not worth parsing for a capped wait
+        wait = default
+    return min(max(wait, 0.0), CHAT_MAX_BACKOFF)
+
 
 class VisionAI:
-    def __init__(self, api_key: str):
-        self.client = OpenAI(api_key=api_key)
+    def __init__(self, api_key: str, survey_threshold: int = PHASH_THRESHOLD):
+        # One pooled connection set, shared by the SDK (streaming) and _chat()
+        self._http = httpx.Client(
+            limits=httpx.Limits(max_keepalive_connections=PREFETCH_WORKERS, keepalive_expiry=OPENAI_KEEPALIVE),
+            timeout=httpx.Timeout(30.0, connect=5.0),
+        )
+        self.client = OpenAI(api_key=api_key, http_client=self._http)
+        self._chat_url = str(self.client.base_url.join("chat/completions"))
+        self._headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
         self.model = "gpt-4o-mini"
         self.lock = threading.Lock()
-        self.last_commentary_time = 0
+        self.last_commentary_time = float("-inf")  # time.monotonic() of the last comment/survey
         self.cooldown = 20  # seconds between automatic observations
         self.scene_queue: list[str] = []   # ordered list of objects to comment on
-        self.covered_topics: list[str] = []  # objects already spoken about
+        self.covered_topics: deque[str] = deque(maxlen=40)  # objects already spoken about, oldest first
+        self._topic_set: set[str] = set()    # same contents, for O(1) membership
         self.scene_scanned = False           # has this scene been surveyed yet
         self.max_objects = 3                 # how many objects to cover (mode-dependent)
+        self._last_hash: int | None = None   # pHash of the last surveyed frame
+        self._last_survey: list[str] = []    # what that survey found
+        # Surveys are reused for views within this many pHash bits: higher
+        # saves more calls, lower risks describing a neighbouring view.
+        # The hit/miss counts (and logged distances) are what to tune it by.
+        self.survey_threshold = survey_threshold
+        self.survey_hits = 0
+        self.survey_misses = 0
+        try:
+            self._scenes = SceneCache()      # surveys on disk, across restarts
+        except (OSError, sqlite3.Error) as e:
+            print(f"⚠️  Scene cache disabled: {e}")
+            self._scenes = None
+        self._resp_cache: OrderedDict[tuple, str] = OrderedDict()  # (frame digest, model, question) -> answer
+        self._prefetch: dict[str, Future] = {}  # queued objects' commentary, requested ahead of the cooldown
+        self._prefetcher = ThreadPoolExecutor(max_workers=PREFETCH_WORKERS, thread_name_prefix="vision-prefetch")
+        self._url_memo: tuple[bytes, str] = (b"", "")  # (frame digest, data URL) of the last frame encoded
+        self._phash_cache: deque[tuple[int, str, str]] = deque(maxlen=PHASH_CACHE_SIZE)  # (phash, question, answer)
 
-    def frame_to_b64(self, jpeg_bytes: bytes) -> str:
-        return base64.standard_b64encode(jpeg_bytes).decode("utf-8")
+    def frame_to_data_url(self, jpeg_bytes: bytes | memoryview) -> str:
+        """data: URL for the frame — built as bytes, decoded to str exactly once."""
+        return (DATA_URL_PREFIX + base64.b64encode(jpeg_bytes)).decode("ascii")
 
-    def _scan_scene(self, b64: str) -> list[str]:
+    def _scan_scene(self, image_url: str) -> tuple[list[str], str | None]:
         """
-        One-shot scene survey: identify and rank the top 4 most interesting
-        objects visible. Returns an ordered list of object names.
+        One-shot scene survey: identify and rank the most interesting objects
+        visible, and comment on the first in the same round-trip.
+        Returns (ordered object names, commentary on objects[0] or None).
         """
         n = self.max_objects
         try:
-            r = self.client.chat.completions.create(
+            raw = self._chat(
                 model=self.model,
                 messages=[
-                    {"role": "system", "content": (
-                        "You are a sharp observer. Your job is to survey a scene and identify "
-                        "the most interesting physical objects to comment on."
-                    )},
+                    _SURVEY_SYSTEM,
                     {"role": "user", "content": [
                         {"type": "image_url",
-                         "image_url": {"url": f"data:image/jpeg;base64,{b64}", "detail": "low"}},
-                        {"type": "text", "text": (
-                            f"List the {n} most interesting distinct physical objects visible, "
-                            f"ranked from most to least interesting. "
-                            f"Reply with ONLY a numbered list, one object per line, 1-4 words each. "
-                            f"Example:\n1. gaming PC\n2. wooden desk\n3. dual monitors"
-                        )},
+                         "image_url": {"url": image_url, "detail": "low"}},
+                        _survey_text(n),
                     ]},
                 ],
-                max_tokens=max(40, n * 12),
+                max_tokens=max(40, n * 12) + 100,
                 temperature=0.3,
-            )
-            raw = r.choices[0].message.content.strip()
-            objects = []
-            for line in raw.splitlines():
-                line = line.strip()
-                # Strip any "1." / "2." etc numbering
-                import re
-                line = re.sub(r"^\d+\.\s*", "", line)
-                if line:
-                    objects.append(line.lower())
+                response_format={"type": "json_object"},
+            ).strip()
+            try:
+                reply = json.loads(raw)
+                objects = [str(o).strip().lower() for o in reply.get("objects", []) if str(o).strip()]
+                first = (reply.get("first_commentary") or "").strip() or None
+            except (ValueError, AttributeError):
+                # Not JSON after all — fall back to reading it as a numbered list
+                first = None
+                objects = [o for line in raw.splitlines()
+                           if (o := NUM_PREFIX.sub("", line).strip().lower())]
             print(f"Vision: scene survey ({n} objects) → {objects}")
-            return objects[:n]
+            return objects[:n], (first if objects else None)
         except Exception as e:
             print(f"Vision scan error: {e}")
-            return []
+            return [], None
 
-    def _comment_on(self, b64: str, obj: str) -> str | None:
-        """Generate a commentary sentence specifically about one named object."""
+    def _comment_on(self, image_url: str, obj: str, on_sentence=None) -> str | None:
+        """
+        Generate a commentary sentence specifically about one named object.
+        With on_sentence, the reply is streamed and each sentence is handed
+        over as soon as it's complete, so speech can start before the rest
+        is generated. The full text is returned either way.
+        """
+        request = dict(
+            model=self.model,
+            messages=[
+                _COMMENT_SYSTEM,
+                {"role": "user", "content": [
+                    {"type": "image_url",
+                     "image_url": {"url": image_url, "detail": "low"}},
+                    {"type": "text", "text": COMMENT_TEXT.format(obj=obj)},
+                ]},
+            ],
+            max_tokens=100,
+            temperature=0.85,
+        )
+        spoken = []  # sentences already passed to on_sentence
         try:
-            r = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": SYSTEM_PROMPT},
-                    {"role": "user", "content": [
-                        {"type": "image_url",
-                         "image_url": {"url": f"data:image/jpeg;base64,{b64}", "detail": "low"}},
-                        {"type": "text",
-                         "text": f"Comment specifically on the {obj}. 1-3 sentences, be insightful and concise."},
-                    ]},
-                ],
-                max_tokens=100,
-                temperature=0.85,
-            )
-            return r.choices[0].message.content.strip()
+            if on_sentence is None:
+                return self._chat(**request).strip()
+            r = self.client.chat.completions.create(**request, stream=True)
+            pending = ""
+            for chunk in r:
+                if not chunk.choices:
+                    continue
+                pending += chunk.choices[0].delta.content or ""
+                *done, pending = SENTENCE_END.split(pending)
+                for sentence in done:
+                    on_sentence(sentence)
+                    spoken.append(sentence)
+            if pending.strip():
+                on_sentence(pending.strip())
+                spoken.append(pending.strip())
+            return " ".join(spoken) or None
         except Exception as e:
             print(f"Vision comment error: {e}")
-            return None
+            # Sentences already handed to on_sentence have been heard — they
+            # are the answer, and must still be logged and cached
+            return " ".join(spoken) or None
 
     def reset_scene(self):
         """Call this when the robot moves to a new location."""
         with self.lock:
             self.scene_queue.clear()
             self.covered_topics.clear()
+            self._topic_set.clear()
+            self._phash_cache.clear()  # robot moved — "looks the same" no longer means the same place
+            for f in self._prefetch.values():
+                f.cancel()
+            self._prefetch.clear()
             self.scene_scanned = False
         print("Vision: scene reset — ready for new environment")
 
-    def observe(self, jpeg_bytes: bytes, question: str = None) -> str | None:
+    def observe(self, jpeg_bytes: bytes | memoryview, question: str = None, on_sentence=None) -> str | None:
         """
         Observe the scene and return commentary.
         - Automatic: surveys scene once → builds top-4 queue → works through it
         - question: direct question answered against current frame
+        jpeg_bytes is only ever read (np.frombuffer / b64encode), so the
+        camera's shared frame or a memoryview of it is passed without copying.
+        on_sentence (questions only) receives the answer sentence by sentence
+        as it streams in — or whole, when it comes from cache.
         """
-        now = time.time()
-        b64 = self.frame_to_b64(jpeg_bytes)
+        now = time.monotonic()  # immune to NTP / wall-clock jumps
 
         # --- Direct question mode ---
         if question:
-            return self._comment_on(b64, question)
+            # Same frame + same question (a double-click, a repeated ask while
+            # the camera is paused) is answered from memory — no encode, no call
+            digest = hashlib.blake2b(jpeg_bytes, digest_size=16).digest()
+            key = (digest, self.model, question)
+            answer = self._cache_get(key)
+            if answer is not None:
+                if on_sentence:
+                    on_sentence(answer)
+                return answer
+            # Sensor noise makes every capture byte-different; a view that
+            # *looks* the same gets the same answer
+            h = phash(jpeg_bytes)
+            answer = self._near_answer(h, question)
+            if answer is not None and on_sentence:
+                on_sentence(answer)
+            if answer is None:
+                answer = self._comment_on(self._image_url(jpeg_bytes, digest), question, on_sentence)
+                if answer and h is not None:
+                    with self.lock:
+                        self._phash_cache.append((h, question, answer))
+            if answer:
+                self._cache_put(key, answer)
+            return answer
 
-        # --- Cooldown check ---
+        # --- Cooldown check + queue pop, one critical section (before any
+        # encoding — most ticks stop here) ---
         with self.lock:
+            if self.max_objects == 0:
+                return None  # quiet mode: no survey, no comments — not even a phash
             if now - self.last_commentary_time < self.cooldown:
                 return None
+            surveying = not self.scene_scanned
+            if not surveying:
+                # Surveys sometimes list the same thing twice — skip anything already covered
+                while self.scene_queue and self.scene_queue[0] in self._topic_set:
+                    self.scene_queue.pop(0)
+                if not self.scene_queue:
+                    # All done — stay quiet
+                    return None
+                obj = self.scene_queue.pop(0)
+                self._record_topic(obj)
+                self.last_commentary_time = now
+                pending = self._prefetch.pop(obj, None)
 
         # --- Scene survey (first time) ---
-        if not self.scene_scanned:
-            objects = self._scan_scene(b64)
+        if surveying:
+            h = phash(jpeg_bytes)
+            n = self.max_objects
+            cached = None
+            if h is not None:
+                d = (h ^ self._last_hash).bit_count() if self._last_hash is not None else 64
+                if d < self.survey_threshold and len(self._last_survey) >= n:
+                    # Rescan of a view we've already surveyed (mode change, "New
+                    # Scene" without moving) — the answer would be the same list
+                    cached = (self._last_survey, d)
+                elif self._scenes:
+                    # ...or one surveyed before the last restart
+                    cached = self._scenes.lookup(h, n, self.model, self.survey_threshold)
+            if cached:
+                self.survey_hits += 1
+                objects, first = cached[0][:n], None
+                print(f"Vision: scene unchanged (Δ{cached[1]} bits, {self.survey_hits} hits / "
+                      f"{self.survey_misses} misses) — reusing survey → {objects}")
+            else:
+                self.survey_misses += 1
+                objects, first = self._scan_scene(self._image_url(jpeg_bytes))
+                if objects:
+                    self._last_hash, self._last_survey = h, objects
+                    if self._scenes and h is not None:
+                        self._scenes.store(h, objects, self.model)
             with self.lock:
-                self.scene_queue = objects
+                self.scene_queue = list(objects)
                 self.scene_scanned = True
-                self.last_commentary_time = now  # pause after scan
-            return None  # let cooldown pass before first comment
+                self.last_commentary_time = now  # cooldown runs from here either way
+                if first:
+                    # The survey already commented on object #1 — speak it now
+                    self._record_topic(self.scene_queue.pop(0))
+            self._prefetch_queue(jpeg_bytes)
+            if first:
+                print(f"Vision: [{objects[0]}] → {first[:60]}...")
+            return first  # None: let cooldown pass before first comment
 
         # --- Work through queue ---
-        with self.lock:
-            if not self.scene_queue:
-                # All done — stay quiet
-                return None
-            obj = self.scene_queue.pop(0)
-            self.covered_topics.append(obj)
-            self.last_commentary_time = now
-
-        commentary = self._comment_on(b64, obj)
+        commentary = pending.result() if pending else None
+        if commentary is None:
+            commentary = self._comment_on(self._image_url(jpeg_bytes), obj)
+        self._prefetch_queue(jpeg_bytes)
         if commentary:
             print(f"Vision: [{obj}] → {commentary[:60]}...")
             print(f"Vision: remaining → {self.scene_queue}")
         return commentary
 
+    def _chat(self, **body) -> str:
+        """
+        Non-streaming chat completion posted straight over the pooled httpx
+        client — the reply is one string, so the SDK's request/response model
+        building is skipped. Streaming still goes via the SDK.
+        Transient failures are retried with exponential backoff, as the SDK would.
+        """
+        # orjson: the body is mostly one long base64 string, which it copies
+        # through in bulk where stdlib json walks it character by character
+        content = orjson.dumps(body)
+        delay = CHAT_BACKOFF
+        for attempt in range(CHAT_RETRIES + 1):
+            last = attempt == CHAT_RETRIES
+            try:
+                r = self._http.post(self._chat_url, headers=self._headers, content=content)
+            except httpx.TransportError as e:
+                if last:
+                    raise
+                wait = delay
+                print(f"Vision: {type(e).__name__}, retrying in {wait:.1f}s")
+            else:
+                if last or r.status_code not in RETRY_STATUS:
+                    r.raise_for_status()
+                    return orjson.loads(r.content)["choices"][0]["message"]["content"]
+                wait = _retry_after(r, delay)
+                print(f"Vision: HTTP {r.status_code}, retrying in {wait:.1f}s")
+            time.sleep(wait)
+            delay *= 2
+
+    def _prefetch_queue(self, jpeg_bytes: bytes | memoryview):
+        """
+        Start commentary for every queued object at once, in parallel. The
+        requests are independent, so the whole scene costs about one
+        round-trip; the cooldown only paces when each is spoken.
+        """
+        with self.lock:
+            todo = [o for o in dict.fromkeys(self.scene_queue)
+                    if o not in self._topic_set and o not in self._prefetch]
+        if not todo:
+            return
+        image_url = self._image_url(jpeg_bytes)
+        with self.lock:
+            for obj in todo:
+                if obj in self.scene_queue:  # not reset while we were encoding
+                    self._prefetch[obj] = self._prefetcher.submit(self._comment_on, image_url, obj)
+
+    def _image_url(self, jpeg_bytes: bytes | memoryview, digest: bytes = None) -> str:
+        """
+        Downscaled data URL for a frame, memoised for the last frame encoded —
+        a question about the frame the vision loop just used skips the
+        decode/resize/encode/base64 entirely.
+        """
+        digest = digest or hashlib.blake2b(jpeg_bytes, digest_size=16).digest()
+        memo_digest, url = self._url_memo
+        if memo_digest != digest:
+            url = self.frame_to_data_url(shrink_jpeg(jpeg_bytes))
+            self._url_memo = (digest, url)
+        return url
+
+    def _cache_get(self, key: tuple) -> str | None:
+        with self.lock:
+            answer = self._resp_cache.get(key)
+            if answer is not None:
+                self._resp_cache.move_to_end(key)
+            return answer
+
+    def _near_answer(self, h: int | None, question: str) -> str | None:
+        """Answer to the same question about a frame within PHASH_THRESHOLD bits of h."""
+        if h is None:
+            return None
+        with self.lock:
+            for cached_h, cached_q, answer in reversed(self._phash_cache):
+                if cached_q == question and (h ^ cached_h).bit_count() < PHASH_THRESHOLD:
+                    return answer
+        return None
+
+    def _cache_put(self, key: tuple, answer: str):
+        with self.lock:
+            self._resp_cache[key] = answer
+            self._resp_cache.move_to_end(key)
+            while len(self._resp_cache) > RESPONSE_CACHE_SIZE:
+                self._resp_cache.popitem(last=False)
+
+    def seconds_until_due(self) -> float:
+        """How long until observe() could next produce something, so the caller can sleep exactly that long."""
+        with self.lock:
+            if self.max_objects == 0 or (self.scene_scanned and not self.scene_queue):
+                return float("inf")  # quiet, or everything covered — nothing until reset_scene()
+            return max(0.0, self.cooldown - (time.monotonic() - self.last_commentary_time))
+
+    def _record_topic(self, obj: str):
+        """Add to covered_topics (caller holds self.lock); the set tracks whatever the deque evicts."""
+        if obj in self._topic_set:
+            return
+        if len(self.covered_topics) == self.covered_topics.maxlen:
+            self._topic_set.discard(self.covered_topics[0])
+        self.covered_topics.append(obj)
+        self._topic_set.add(obj)
+
     def set_cooldown(self, mode: str):
         """Adjust observation frequency and object count based on talk mode."""
-        self.cooldown = {
-            "talkative": 12,
-            "normal":    30,
-            "quiet":    999,
-        }.get(mode, 30)
-        self.max_objects = {
-            "talkative": 6,
-            "normal":    3,
-            "quiet":     0,
-        }.get(mode, 3)
+        self.cooldown = MODE_COOLDOWN.get(mode, 30)
+        self.max_objects = MODE_MAX_OBJECTS.get(mode, 3)
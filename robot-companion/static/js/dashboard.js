@@ -4,7 +4,9 @@
  */
 
 // ─── Socket.IO ───────────────────────────
-const socket = io();
+// Open straight on WebSocket (the server ships simple-websocket) instead of
+// starting with HTTP long-polling and upgrading later.
+const socket = io({ transports: ['websocket'] });
 
 socket.on('connect', () => {
   setConnectionStatus(true);
@@ -19,14 +21,25 @@ socket.on('state_update', (state) => {
   updateState(state);
 });
 
-socket.on('commentary', (entry) => {
-  addCommentEntry(entry);
-});
+// Entries carry an increasing id: the history sent on connect can already
+// hold entries from a batch that is still waiting to be flushed.
+let lastCommentId = 0;
+
+function addNewComments(entries) {
+  entries.forEach((entry) => {
+    if (entry.id <= lastCommentId) return;
+    lastCommentId = entry.id;
+    addCommentEntry(entry);
+  });
+}
+
+socket.on('commentary_batch', addNewComments);
 
 socket.on('commentary_history', (entries) => {
   commentaryLog.innerHTML = '';
   commentCount = 0;
-  entries.forEach(addCommentEntry);
+  lastCommentId = 0;  // ids restart with the server
+  addNewComments(entries);
 });
 
 
@@ -155,7 +168,7 @@ function updateState(state) {
   const prevMode = window._prevKinectMode;
   if (isStationary && prevMode && prevMode !== 'stationary') {
     const ks = document.getElementById('kinect-stream');
-    if (ks) ks.src = `/kinect_feed?t=${Date.now()}`;
+    if (ks) ks.src = `${STREAM_BASE}/kinect_feed?t=${Date.now()}`;
   }
   window._prevKinectMode = kinectMode;
 
@@ -243,6 +256,18 @@ function setKinectMode(mode) {
   socket.emit('set_kinect_mode', { mode });
 }
 
+function setCameraQuality(quality) {
+  socket.emit('set_camera_quality', { quality });
+  markCameraQuality(quality);
+}
+
+function markCameraQuality(quality) {
+  [30, 50, 75].forEach((q) => {
+    const btn = document.getElementById(`btn-quality-${q}`);
+    if (btn) btn.classList.toggle('active', q === quality);
+  });
+}
+
 function askQuestion() {
   const input = document.getElementById('question-input');
   const question = input.value.trim();
@@ -311,7 +336,7 @@ function onKinectError() {
   // Retry after 3s
   setTimeout(() => {
     const s = document.getElementById('kinect-stream');
-    if (s) s.src = `/kinect_feed?t=${Date.now()}`;
+    if (s) s.src = `${STREAM_BASE}/kinect_feed?t=${Date.now()}`;
   }, 3000);
 }
 
@@ -328,10 +353,10 @@ function refreshCamera() {
   const btn = document.getElementById('btn-refresh-cam');
   btn.textContent = '↻';
   btn.disabled = true;
-  stream.src = `/video_feed?t=${Date.now()}`;
+  stream.src = `${STREAM_BASE}/video_feed?t=${Date.now()}`;
   // Also refresh Kinect stream
   const ks = document.getElementById('kinect-stream');
-  if (ks) ks.src = `/kinect_feed?t=${Date.now()}`;
+  if (ks) ks.src = `${STREAM_BASE}/kinect_feed?t=${Date.now()}`;
   setTimeout(() => {
     btn.textContent = '⟳';
     btn.disabled = false;
@@ -347,7 +372,7 @@ function checkCameraStatus() {
       if (data.available) {
         setLiveStatus(true);
         if (stream.style.display === 'none') {
-          stream.src = `/video_feed?t=${Date.now()}`;
+          stream.src = `${STREAM_BASE}/video_feed?t=${Date.now()}`;
           stream.style.display = 'block';
           placeholder.style.display = 'none';
         }
@@ -355,12 +380,13 @@ function checkCameraStatus() {
         showCameraPlaceholder();
         setLiveStatus(false);
       }
+      markCameraQuality(data.max_quality);
 
       // Kinect availability
       const ks = document.getElementById('kinect-stream');
       const kp = document.getElementById('kinect-placeholder');
       if (data.kinect_available && ks && ks.style.display === 'none') {
-        ks.src = `/kinect_feed?t=${Date.now()}`;
+        ks.src = `${STREAM_BASE}/kinect_feed?t=${Date.now()}`;
       }
     })
     .catch(() => { showCameraPlaceholder(); setLiveStatus(false); });